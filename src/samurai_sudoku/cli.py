@@ -7,22 +7,53 @@ import sys
 import time
 from typing import List, Tuple
 
+import numpy as np
 from reportlab.pdfgen.canvas import Canvas
 from .generator import generate_samurai
 from .pdf import PageSizeMap, draw_puzzle_page, draw_solutions_pages
 
 
 def _count_clues(grid) -> int:
-    return sum(1 for row in grid for v in row if v is not None)
+    return sum(1 for row in grid for v in row if v)
+
+
+# Slowest difficulties first (LPT scheduling) so stragglers start early.
+_DIFF_RANK = {"evil": 0, "hard": 1, "medium": 2, "easy": 3}
+
+
+# Worker-side attachment to the parent's shared solution block (see below).
+_SHM = None
+_GRID_BYTES = 21 * 21
+
+
+def _warm_worker(shm_name=None) -> None:
+    """
+    Run once per worker process at pool start-up: importing dlx9 builds the
+    DLX matrix and (via its import-time dummy solve) forces JIT compilation,
+    so that cost is paid before the first real task instead of inside it.
+    Also attaches to the parent's shared-memory block for solutions.
+    """
+    from . import dlx9  # noqa: F401 — import side effects do the warming
+    global _SHM
+    if shm_name is not None:
+        from multiprocessing import shared_memory
+        try:
+            # the parent owns the segment; don't let this process's resource
+            # tracker try to clean it up (track= is Python 3.13+)
+            _SHM = shared_memory.SharedMemory(name=shm_name, track=False)
+        except TypeError:
+            _SHM = shared_memory.SharedMemory(name=shm_name)
 
 
 # ---- worker (must be top-level for Windows pickling)
-def _worker_task(args: Tuple[str, int, float, bool]) -> Tuple[str, int, object, object, float]:
+def _worker_task(args: Tuple[int, str, int, float, bool]) -> Tuple[int, str, int, bytes, bytes, float]:
     """
     Generate one puzzle/solution pair.
-    Returns (difficulty, seed, puzzle, solution and seconds).
+    Returns (page_index, difficulty, seed, puzzle, solution and seconds).
+    Boards travel as raw 441-byte buffers — much cheaper to pickle than
+    the int8 arrays, let alone nested lists.
     """
-    difficulty, seed, uniq_timeout, adapt = args
+    page_idx, difficulty, seed, uniq_timeout, adapt = args
     rng = random.Random(seed)
     t0 = time.time()
     puzzle, solution = generate_samurai(
@@ -31,7 +62,16 @@ def _worker_task(args: Tuple[str, int, float, bool]) -> Tuple[str, int, object,
         uniq_timeout_s=uniq_timeout,
         adapt=adapt,
     )
-    return (difficulty, seed, puzzle, solution, time.time() - t0)
+    if _SHM is not None:
+        # write the solution straight into the parent's shared block; only
+        # the puzzle still travels through the result pipe
+        slot = np.ndarray((21, 21), dtype=np.int8, buffer=_SHM.buf,
+                          offset=page_idx * _GRID_BYTES)
+        slot[:] = solution
+        solution_b = None
+    else:
+        solution_b = solution.tobytes()
+    return (page_idx, difficulty, seed, puzzle.tobytes(), solution_b, time.time() - t0)
 
 
 def main() -> None:
@@ -90,10 +130,16 @@ def main() -> None:
     master = random.Random(args.seed)
     child_seeds = [master.randrange(2**63 - 1) for _ in range(len(schedule))]
 
-    # Package worker items (this is where uniq_timeout/adapt are added)
+    # Package worker items (this is where uniq_timeout/adapt are added).
+    # The page index key lets us dispatch slow difficulties first and still
+    # render pages in the requested order.
     uniq_timeout = args.uniq_timeout
     adapt = not args.no_adapt
-    work_items = [(d, s, uniq_timeout, adapt) for d, s in zip(schedule, child_seeds)]
+    work_items = [
+        (i, d, s, uniq_timeout, adapt)
+        for i, (d, s) in enumerate(zip(schedule, child_seeds))
+    ]
+    work_items.sort(key=lambda item: _DIFF_RANK[item[1]])
 
     if not args.quiet:
         mix_str = ", ".join(f"{d}:{schedule.count(d)}" for d in ("easy", "medium", "hard", "evil") if d in schedule)
@@ -105,26 +151,55 @@ def main() -> None:
 
     # ---- Parallel generation
     t_all = time.time()
-    results_ordered: List[Tuple[str, int, object, object, float]] = []
-    with cf.ProcessPoolExecutor(max_workers=args.workers) as ex:
-        # map preserves input order, so pages render in the intended sequence
-        for res in ex.map(_worker_task, work_items):
-            results_ordered.append(res)
-            if not args.quiet:
-                idx = len(results_ordered)
-                diff, seed, puzzle, solution, dt = res
-                clues = _count_clues(puzzle)
-                mean_t = sum(r[-1] for r in results_ordered) / idx
-                eta = mean_t * (len(schedule) - idx)
-                print(f"[{idx}/{len(schedule)}] ({diff}) done in {dt:.1f}s (clues={clues}) — ETA {eta/60:.1f} min")
-                sys.stdout.flush()
-
-    # ---- Render PDF (single process)
+    n_workers = args.workers or os.cpu_count() or 1
+    # Several items per IPC round trip, while keeping ~4 chunks per worker
+    # for load balancing.
+    chunksize = max(1, len(work_items) // (n_workers * 4))
+    results: List = [None] * len(work_items)
+
+    # One shared block holds every solution: workers write into their slot
+    # and the pickled result shrinks to the puzzle plus a few scalars.
+    shm = None
+    try:
+        from multiprocessing import shared_memory
+        shm = shared_memory.SharedMemory(create=True, size=len(work_items) * _GRID_BYTES)
+    except OSError:
+        shm = None  # no shared memory here; solutions ride the result pipe
+
+    try:
+        with cf.ProcessPoolExecutor(
+            max_workers=args.workers,
+            initializer=_warm_worker,
+            initargs=(shm.name if shm is not None else None,),
+        ) as ex:
+            done = 0
+            for res in ex.map(_worker_task, work_items, chunksize=chunksize):
+                page_idx, diff, seed, puzzle_b, solution_b, dt = res
+                puzzle = np.frombuffer(puzzle_b, dtype=np.int8).reshape(21, 21)
+                if solution_b is None:
+                    solution = np.ndarray((21, 21), dtype=np.int8, buffer=shm.buf,
+                                          offset=page_idx * _GRID_BYTES).copy()
+                else:
+                    solution = np.frombuffer(solution_b, dtype=np.int8).reshape(21, 21)
+                results[page_idx] = (page_idx, diff, seed, puzzle, solution, dt)
+                done += 1
+                if not args.quiet:
+                    clues = _count_clues(puzzle)
+                    mean_t = sum(r[-1] for r in results if r is not None) / done
+                    eta = mean_t * (len(schedule) - done)
+                    print(f"[{done}/{len(schedule)}] ({diff}) done in {dt:.1f}s (clues={clues}) — ETA {eta/60:.1f} min")
+                    sys.stdout.flush()
+    finally:
+        if shm is not None:
+            shm.close()
+            shm.unlink()
+
+    # ---- Render PDF (single process), in page order
     c = Canvas(args.outfile, pagesize=pagesize)
-    for i, (diff, seed, puzzle, solution, dt) in enumerate(results_ordered, start=1):
+    for i, (page_idx, diff, seed, puzzle, solution, dt) in enumerate(results, start=1):
         draw_puzzle_page(c, puzzle, i, len(schedule), diff, pagesize)
         c.showPage()
-    draw_solutions_pages(c, [sol for _, _, _, sol, _ in results_ordered], pagesize=pagesize, puzzles_per_row=2)
+    draw_solutions_pages(c, [sol for _, _, _, _, sol, _ in results], pagesize=pagesize, puzzles_per_row=2)
     c.save()
 
     if not args.quiet:
@@ -1,13 +1,35 @@
 from __future__ import annotations
-from typing import List, Tuple, Optional
+from typing import List, Tuple
 import random
 
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:  # numba is an optional extra (~50 MB); run interpreted
+    def njit(*args, **kwargs):
+        def wrap(fn):
+            return fn
+        return wrap
+
 # Exact cover columns: row-constraint(81) + col-constraint(81) + box-constraint(81) + cell-constraint(81) = 324
 # We encode a candidate (r,c,d) as a row in the matrix covering 4 columns:
 #  - row r has digit d
 #  - col c has digit d
 #  - box b has digit d
 #  - cell (r,c) is assigned (one-hot)
+#
+# The matrix is held as Knuth's Dancing Links structure in flat int32 arrays:
+# node 0 is the root header, nodes 1..324 are column headers, and each of the
+# 729 candidate rows contributes 4 nodes spliced into its column lists.
+# cover/uncover are O(1) pointer unlinks, so backtracking never rebuilds state.
+# The hot kernels are compiled with Numba; the pristine arrays are built once
+# at import and copied per solve.
+
+N_COLS = 324
+N_ROWS = 729
+N_NODES = 1 + N_COLS + 4 * N_ROWS
+DIGITS = 0x1FF  # 9-bit mask, bit d = digit d+1
 
 def _box_index(r: int, c: int) -> int:
     return (r // 3) * 3 + (c // 3)
@@ -25,142 +47,376 @@ def _col_ids_for_candidate(r: int, c: int, d: int) -> Tuple[int, int, int, int]:
         CEL_O + r * 9 + c,
     )
 
+def _row_id(r: int, c: int, d: int) -> int:
+    return (r * 9 + c) * 9 + d
+
+def _build_matrix():
+    """Build the pristine node arrays once; solve_random works on copies."""
+    L = np.zeros(N_NODES, dtype=np.int32)
+    R = np.zeros(N_NODES, dtype=np.int32)
+    U = np.zeros(N_NODES, dtype=np.int32)
+    D = np.zeros(N_NODES, dtype=np.int32)
+    C = np.zeros(N_NODES, dtype=np.int32)       # column header of each node
+    S = np.zeros(N_COLS + 1, dtype=np.int32)    # column sizes, by header id 1..324
+    RID = np.full(N_NODES, -1, dtype=np.int32)  # candidate row id of each node
+    row_node = np.zeros(N_ROWS, dtype=np.int32)  # first node of each candidate row
+
+    # Circular header list: root 0 <-> headers 1..324
+    for h in range(N_COLS + 1):
+        L[h] = h - 1
+        R[h] = h + 1
+        U[h] = h
+        D[h] = h
+        C[h] = h
+    L[0] = N_COLS
+    R[N_COLS] = 0
+
+    node = N_COLS + 1
+    for r in range(9):
+        for c in range(9):
+            for d in range(9):
+                rid = _row_id(r, c, d)
+                row_node[rid] = node
+                first = node
+                for col in _col_ids_for_candidate(r, c, d):
+                    h = col + 1
+                    # insert at the bottom of column h
+                    U[node] = U[h]
+                    D[node] = h
+                    D[U[h]] = node
+                    U[h] = node
+                    C[node] = h
+                    S[h] += 1
+                    RID[node] = rid
+                    # horizontal circular link within the row
+                    if node == first:
+                        L[node] = node
+                        R[node] = node
+                    else:
+                        L[node] = L[first]
+                        R[node] = first
+                        R[L[first]] = node
+                        L[first] = node
+                    node += 1
+    return L, R, U, D, C, S, RID, row_node
+
+_L0, _R0, _U0, _D0, _C, _S0, _RID, _ROW_NODE = _build_matrix()
+
+# All 27 units (rows, cols, boxes) as cell tuples, for singles propagation.
+_UNITS = (
+    [tuple((r, c) for c in range(9)) for r in range(9)]
+    + [tuple((r, c) for r in range(9)) for c in range(9)]
+    + [
+        tuple((br + y, bc + x) for y in range(3) for x in range(3))
+        for br in range(0, 9, 3)
+        for bc in range(0, 9, 3)
+    ]
+)
+
+def _place(board, row_mask, col_mask, box_mask, r: int, c: int, v: int) -> None:
+    bit = 1 << (v - 1)
+    board[r][c] = v
+    row_mask[r] |= bit
+    col_mask[c] |= bit
+    box_mask[_box_index(r, c)] |= bit
+
+def propagate_singles(board, row_mask, col_mask, box_mask) -> bool:
+    """
+    Place naked and hidden singles until a fixpoint. board is 9x9 with 0 for
+    empty; the masks are 9-bit used-digit masks per row/col/box and are kept
+    in sync. Returns False if a contradiction is detected, True otherwise.
+    """
+    progress = True
+    while progress:
+        progress = False
+        # naked singles: cells with exactly one candidate
+        for r in range(9):
+            rm = row_mask[r]
+            for c in range(9):
+                if board[r][c]:
+                    continue
+                cand = DIGITS & ~(rm | col_mask[c] | box_mask[_box_index(r, c)])
+                if cand == 0:
+                    return False
+                if cand & (cand - 1) == 0:
+                    _place(board, row_mask, col_mask, box_mask, r, c, cand.bit_length())
+                    rm = row_mask[r]
+                    progress = True
+        # hidden singles: digits with exactly one legal cell in a unit
+        for cells in _UNITS:
+            used = 0
+            for r, c in cells:
+                v = board[r][c]
+                if v:
+                    used |= 1 << (v - 1)
+            missing = DIGITS & ~used
+            while missing:
+                bit = missing & -missing
+                missing ^= bit
+                spot = None
+                n = 0
+                for r, c in cells:
+                    if board[r][c]:
+                        continue
+                    if not (row_mask[r] | col_mask[c] | box_mask[_box_index(r, c)]) & bit:
+                        n += 1
+                        if n > 1:
+                            break
+                        spot = (r, c)
+                if n == 0:
+                    return False
+                if n == 1:
+                    _place(board, row_mask, col_mask, box_mask, spot[0], spot[1], bit.bit_length())
+                    progress = True
+    return True
+
+@njit(cache=True, nogil=True)
+def _cover(L, R, U, D, C, S, h):
+    R[L[h]] = R[h]
+    L[R[h]] = L[h]
+    i = D[h]
+    while i != h:
+        j = R[i]
+        while j != i:
+            D[U[j]] = D[j]
+            U[D[j]] = U[j]
+            S[C[j]] -= 1
+            j = R[j]
+        i = D[i]
+
+@njit(cache=True, nogil=True)
+def _uncover(L, R, U, D, C, S, h):
+    i = U[h]
+    while i != h:
+        j = L[i]
+        while j != i:
+            S[C[j]] += 1
+            D[U[j]] = j
+            U[D[j]] = j
+            j = L[j]
+        i = U[i]
+    R[L[h]] = h
+    L[R[h]] = h
+
+@njit(cache=True, nogil=True)
+def _select_row(L, R, U, D, C, S, n):
+    """Cover all 4 columns of the candidate row containing node n."""
+    _cover(L, R, U, D, C, S, C[n])
+    j = R[n]
+    while j != n:
+        _cover(L, R, U, D, C, S, C[j])
+        j = R[j]
+
+@njit(cache=True, nogil=True)
+def _search(L, R, U, D, C, S, RID, sol, seed):
+    """
+    Iterative Algorithm X over the linked matrix. Fills sol[0:depth] with the
+    chosen candidate row ids and returns depth, or -1 if no solution exists.
+    Row order at each level is shuffled (Fisher-Yates) for randomized output.
+    """
+    np.random.seed(seed)
+    max_depth = 81
+    cols = np.empty(max_depth, dtype=np.int32)          # covered column per level
+    rows_buf = np.empty((max_depth, 9), dtype=np.int32)  # candidate nodes per level
+    row_cnt = np.empty(max_depth, dtype=np.int32)
+    row_idx = np.empty(max_depth, dtype=np.int32)
+
+    depth = 0
+    need_col = True
+    while True:
+        if need_col:
+            if R[0] == 0:
+                return depth
+            # Knuth's S heuristic: column with the fewest remaining candidates
+            best = R[0]
+            best_s = S[best]
+            h = R[best]
+            while h != 0 and best_s > 1:
+                if S[h] < best_s:
+                    best = h
+                    best_s = S[h]
+                h = R[h]
+            _cover(L, R, U, D, C, S, best)
+            cols[depth] = best
+            cnt = 0
+            i = D[best]
+            while i != best:
+                rows_buf[depth, cnt] = i
+                cnt += 1
+                i = D[i]
+            # Fisher-Yates shuffle of the candidate rows at this level
+            for a in range(cnt - 1, 0, -1):
+                b = np.random.randint(a + 1)
+                tmp = rows_buf[depth, a]
+                rows_buf[depth, a] = rows_buf[depth, b]
+                rows_buf[depth, b] = tmp
+            row_cnt[depth] = cnt
+            row_idx[depth] = 0
+            need_col = False
+        if row_idx[depth] < row_cnt[depth]:
+            i = rows_buf[depth, row_idx[depth]]
+            row_idx[depth] += 1
+            sol[depth] = RID[i]
+            j = R[i]
+            while j != i:
+                _cover(L, R, U, D, C, S, C[j])
+                j = R[j]
+            depth += 1
+            need_col = True
+        else:
+            _uncover(L, R, U, D, C, S, cols[depth])
+            if depth == 0:
+                return -1
+            depth -= 1
+            i = rows_buf[depth, row_idx[depth] - 1]
+            j = L[i]
+            while j != i:
+                _uncover(L, R, U, D, C, S, C[j])
+                j = L[j]
+
+@njit(cache=True, nogil=True)
+def _search_count(L, R, U, D, C, S, limit):
+    """
+    Deterministic counting variant of _search: shortest column first, rows in
+    increasing candidate order (fast-fail, Knuth's S heuristic without the
+    shuffle). Counts complete solutions up to limit and keeps backtracking
+    after each one. The arrays are left covered; callers work on copies.
+    """
+    count = 0
+    max_depth = 81
+    cols = np.empty(max_depth, dtype=np.int32)
+    rows_buf = np.empty((max_depth, 9), dtype=np.int32)
+    row_cnt = np.empty(max_depth, dtype=np.int32)
+    row_idx = np.empty(max_depth, dtype=np.int32)
+
+    depth = 0
+    need_col = True
+    while True:
+        if need_col:
+            if R[0] == 0:
+                count += 1
+                if count >= limit or depth == 0:
+                    return count
+                # undo the row that completed this solution and keep searching
+                depth -= 1
+                i = rows_buf[depth, row_idx[depth] - 1]
+                j = L[i]
+                while j != i:
+                    _uncover(L, R, U, D, C, S, C[j])
+                    j = L[j]
+                need_col = False
+                continue
+            best = R[0]
+            best_s = S[best]
+            h = R[best]
+            while h != 0 and best_s > 1:
+                if S[h] < best_s:
+                    best = h
+                    best_s = S[h]
+                h = R[h]
+            _cover(L, R, U, D, C, S, best)
+            cols[depth] = best
+            cnt = 0
+            i = D[best]
+            while i != best:
+                rows_buf[depth, cnt] = i
+                cnt += 1
+                i = D[i]
+            row_cnt[depth] = cnt
+            row_idx[depth] = 0
+            need_col = False
+        if row_idx[depth] < row_cnt[depth]:
+            i = rows_buf[depth, row_idx[depth]]
+            row_idx[depth] += 1
+            j = R[i]
+            while j != i:
+                _cover(L, R, U, D, C, S, C[j])
+                j = R[j]
+            depth += 1
+            need_col = True
+        else:
+            _uncover(L, R, U, D, C, S, cols[depth])
+            if depth == 0:
+                return count
+            depth -= 1
+            i = rows_buf[depth, row_idx[depth] - 1]
+            j = L[i]
+            while j != i:
+                _uncover(L, R, U, D, C, S, C[j])
+                j = L[j]
+
+def solve_count(givens: List[Tuple[int, int, int]], limit: int = 2) -> int:
+    """
+    Count 9x9 solutions consistent with givens, up to limit. Unlike
+    solve_random this is fully deterministic — for certifying uniqueness the
+    shortest-column/fixed-row ordering fails fastest, and randomness would
+    only cost RNG calls without changing the count.
+    """
+    L = _L0.copy()
+    R = _R0.copy()
+    U = _U0.copy()
+    D = _D0.copy()
+    S = _S0.copy()
+    for (gr, gc, gd) in givens:
+        _select_row(L, R, U, D, _C, S, _ROW_NODE[_row_id(gr, gc, gd)])
+    return int(_search_count(L, R, U, D, _C, S, limit))
+
 def solve_random(rng: random.Random, givens: List[Tuple[int, int, int]]) -> List[List[int]]:
     """
     Return a full 9x9 solution using DLX / Algorithm X with randomized branching.
     givens: list of (r,c,d) with r,c,d in 0..8 (digit d is 0..8 meaning '1..9')
     """
-    # Build column → set(rows) and row → list(columns) structures
-    rows_for_col = [set() for _ in range(324)]
-    cols_for_row: List[List[int]] = []
+    board = [[0] * 9 for _ in range(9)]
 
-    def row_id(r: int, c: int, d: int) -> int:
-        return (r * 9 + c) * 9 + d
+    # Constrained boards (e.g. corners seeded from a solved center overlap)
+    # often finish on singles propagation alone; it only places forced digits,
+    # so the random distribution of completions is unaffected.
+    if givens:
+        row_mask = [0] * 9
+        col_mask = [0] * 9
+        box_mask = [0] * 9
+        for gr, gc, gd in givens:
+            _place(board, row_mask, col_mask, box_mask, gr, gc, gd + 1)
+        if propagate_singles(board, row_mask, col_mask, box_mask):
+            filled = [
+                (r, c, board[r][c] - 1)
+                for r in range(9)
+                for c in range(9)
+                if board[r][c]
+            ]
+            if len(filled) == 81:
+                return board
+            givens = filled
+        # on contradiction fall through with the raw givens; DLX proves
+        # them unsatisfiable and the ValueError below fires
 
-    for r in range(9):
-        for c in range(9):
-            for d in range(9):
-                rid = row_id(r, c, d)
-                cols = list(_col_ids_for_candidate(r, c, d))
-                cols_for_row.append(cols)
-                for col in cols:
-                    rows_for_col[col].add(rid)
-
-    # Cover givens
-    active_rows = set(range(9 * 9 * 9))
-    active_cols = set(range(324))
-    solution_rids: List[int] = []
-
-    def cover(col: int):
-        # remove column and conflicting rows
-        for rid in list(rows_for_col[col]):
-            if rid in active_rows:
-                active_rows.remove(rid)
-                for cc in cols_for_row[rid]:
-                    if cc in active_cols and rid in rows_for_col[cc]:
-                        rows_for_col[cc].remove(rid)
-        if col in active_cols:
-            active_cols.remove(col)
-
-    def uncover(col: int):
-        # restore column and rows (reverse of cover)
-        if col not in active_cols:
-            active_cols.add(col)
-        for rid in range(9 * 9 * 9):
-            if rid in cols_for_row[rid]:
-                pass  # noop + we restore via rebuilding sets below
-
-    # Apply givens
+    L = _L0.copy()
+    R = _R0.copy()
+    U = _U0.copy()
+    D = _D0.copy()
+    S = _S0.copy()
+
+    # Apply givens: cover all 4 columns of each given's candidate row
     for (gr, gc, gd) in givens:
-        # find the row representing (gr,gc,gd)
-        rid = row_id(gr, gc, gd)
-        if rid not in active_rows:
-            # prune conflicts by covering its columns
-            pass
-        # cover all columns hit by that row
-        for col in cols_for_row[rid]:
-            cover(col)
-        solution_rids.append(rid)
-
-    # For speed, rebuild rows_for_col after givens: keep only active_rows
-    rows_for_col = [
-        set(rid for rid in s if rid in active_rows or rid in solution_rids)
-        for s in rows_for_col
-    ]
+        _select_row(L, R, U, D, _C, S, _ROW_NODE[_row_id(gr, gc, gd)])
+        board[gr][gc] = gd + 1
 
-    # Backtracking (Algorithm X), randomized column choice among mins
-    def choose_col() -> Optional[int]:
-        # choose the column with minimal candidates
-        best_col = None
-        best_len = 10**9
-        for col in active_cols:
-            cand = len(rows_for_col[col])
-            if cand < best_len:
-                best_len = cand
-                best_col = col
-                if best_len <= 1:
-                    break
-        return best_col
-
-    stack: List[Tuple[int, List[int]]] = []  # (col, list_of_rids_tried)
-    solution = solution_rids[:]
-    while True:
-        if not active_cols:  # all constraints covered
-            break
-        col = choose_col()
-        if col is None or len(rows_for_col[col]) == 0:
-            # backtrack
-            while stack:
-                col_prev, tried = stack.pop()
-                # revert last row chosen for that column
-                last_rid = tried.pop()
-                # Rebuild from scratch for simplicity (fast enough for 9x9)
-                return _solve_from_scratch(rng, givens)
-            # If stack empty and failed, try from scratch randomized
-            return _solve_from_scratch(rng, givens)
-
-        rids = list(rows_for_col[col])
-        rng.shuffle(rids)
-        rid = rids[0]
-        # select this row: cover its columns
-        cols_hit = cols_for_row[rid]
-        saved_rows_for_col = [rows_for_col[c].copy() for c in cols_hit]
-        saved_active_cols = active_cols.copy()
-        saved_active_rows = active_rows.copy()
-        for c in cols_hit:
-            cover(c)
-        solution.append(rid)
-        stack.append((col, [rid]))
+    sol = np.empty(81, dtype=np.int32)
+    depth = _search(L, R, U, D, _C, S, _RID, sol, rng.randrange(2**31))
+    if depth < 0:
+        # cannot happen for givens taken from a valid solved overlap
+        raise ValueError("givens are unsatisfiable")
 
     # Decode solution rows to 9x9 values
-    board = [[0] * 9 for _ in range(9)]
-    for rid in solution:
+    for k in range(depth):
+        rid = int(sol[k])
         r = (rid // 9) // 9
         c = (rid // 9) % 9
         d = rid % 9
         board[r][c] = d + 1
     return board
 
-def _solve_from_scratch(rng: random.Random, givens: List[Tuple[int,int,int]]) -> List[List[int]]:
-    # Simple randomized fill using recursion + constraint sets (fast for 9x9)
-    rows = [set() for _ in range(9)]
-    cols = [set() for _ in range(9)]
-    boxs = [set() for _ in range(9)]
-    board = [[0]*9 for _ in range(9)]
-    for r,c,d in givens:
-        v = d+1
-        b = (r//3)*3 + (c//3)
-        rows[r].add(v); cols[c].add(v); boxs[b].add(v); board[r][c] = v
-    cells = [(r,c) for r in range(9) for c in range(9) if board[r][c]==0]
-    def backtrack(i=0):
-        if i==len(cells): return True
-        r,c = cells[i]
-        b = (r//3)*3 + (c//3)
-        cand = [v for v in rng.sample(range(1,10),9) if v not in rows[r] and v not in cols[c] and v not in boxs[b]]
-        for v in cand:
-            board[r][c]=v; rows[r].add(v); cols[c].add(v); boxs[b].add(v)
-            if backtrack(i+1): return True
-            rows[r].remove(v); cols[c].remove(v); boxs[b].remove(v); board[r][c]=0
-        return False
-    assert backtrack()
-    return board
\ No newline at end of file
+# Warm the JIT cache at import so the first generate_samurai call is not
+# paying compilation cost (cache=True makes later imports near-instant).
+solve_random(random.Random(0), [])
+solve_count([], limit=1)
@@ -1,9 +1,12 @@
 from __future__ import annotations
 import random, time
 from typing import Tuple, List
+
+import numpy as np
+
 from .geometry import active_cells, BOARDS, in_board
 from .model import Grid, empty_samurai_grid
-from .solver import solve_unique
+from .solver import has_second_solution, solve_unique
 from .dlx9 import solve_random
 
 DIFFICULTY_CLUES = {
@@ -14,9 +17,7 @@ DIFFICULTY_CLUES = {
 }
 
 def _embed(board9: List[List[int]], g: Grid, r0: int, c0: int) -> None:
-    for r in range(9):
-        for c in range(9):
-            g[r0 + r][c0 + c] = board9[r][c]
+    g[r0:r0 + 9, c0:c0 + 9] = board9
 
 def _extract_overlap_givens(center9: List[List[int]], corner: str) -> List[tuple]:
     """Return givens (r,c,d0..8) for the overlapping 3x3 that corner shares with center."""
@@ -67,28 +68,84 @@ def _solve_samurai_by_composition(rng: random.Random) -> Grid:
     _embed(br, g, 12, 12)
     return g
 
+# Per-process cache of solved Samurai boards. Solving is much dearer than
+# digging, and any solved board yields fresh-looking ones under symmetry
+# transforms, so a worker generating many pages only rarely solves from
+# scratch.
+_SOLVED_CACHE: List[Grid] = []
+_SOLVED_CACHE_SIZE = 4
+_SOLVED_REUSE_PROB = 0.75
+
+def _relabel(board: Grid, rng: random.Random) -> Grid:
+    """Apply a random digit permutation (0 stays 0)."""
+    lut = np.array([0] + rng.sample(range(1, 10), 9), dtype=np.int8)
+    return lut[board]
+
+def _permute_band_rows(board: Grid, rng: random.Random) -> Grid:
+    """Shuffle rows within each global 3-row band.
+
+    Every such band lines up with a band of each board it crosses (e.g. rows
+    6..8 are band 2 of TL/TR and band 0 of the center), so each 9x9 stays a
+    valid sudoku."""
+    out = board.copy()
+    for r0 in range(0, 21, 3):
+        perm = rng.sample(range(3), 3)
+        out[r0:r0 + 3] = board[[r0 + p for p in perm], :]
+    return out
+
+def _permute_band_cols(board: Grid, rng: random.Random) -> Grid:
+    """Shuffle columns within each global 3-column stack (see _permute_band_rows)."""
+    out = board.copy()
+    for c0 in range(0, 21, 3):
+        perm = rng.sample(range(3), 3)
+        out[:, c0:c0 + 3] = board[:, [c0 + p for p in perm]]
+    return out
+
+def _random_symmetry(board: Grid, rng: random.Random) -> Grid:
+    """A random validity-preserving transform of a solved Samurai board."""
+    out = _relabel(board, rng)
+    out = _permute_band_rows(out, rng)
+    out = _permute_band_cols(out, rng)
+    if rng.random() < 0.5:
+        # the Samurai layout is symmetric under transposition
+        out = np.ascontiguousarray(out.T)
+    return out
+
+def _get_solved_board(rng: random.Random) -> Grid:
+    if _SOLVED_CACHE and rng.random() < _SOLVED_REUSE_PROB:
+        base = _SOLVED_CACHE[rng.randrange(len(_SOLVED_CACHE))]
+        return _random_symmetry(base, rng)
+    solved = _solve_samurai_by_composition(rng)
+    if len(_SOLVED_CACHE) < _SOLVED_CACHE_SIZE:
+        _SOLVED_CACHE.append(solved.copy())
+    else:
+        _SOLVED_CACHE[rng.randrange(_SOLVED_CACHE_SIZE)] = solved.copy()
+    return solved
+
 def _dig_holes_to_target(rng: random.Random, solved: Grid, target_clues: int,
                          uniq_timeout_s: float = 10.0) -> Grid:
     """Greedy dig with uniqueness checks, with a per-check timeout; adapt clues if needed."""
-    puzzle = [row[:] for row in solved]
+    puzzle = solved.copy()
     actives = [(r, c) for (r, c) in active_cells()]
     rng.shuffle(actives)
 
     def count_clues(g: Grid) -> int:
-        return sum(1 for (r, c) in actives if g[r][c] is not None)
+        # inactive cells are always 0, so every nonzero entry is a clue
+        return int(np.count_nonzero(g))
 
     for r, c in actives:
         if count_clues(puzzle) <= target_clues:
             break
-        v = puzzle[r][c]
-        if v is None:
+        v = int(puzzle[r, c])
+        if v == 0:
             continue
-        puzzle[r][c] = None
-        # time-boxed uniqueness
+        puzzle[r, c] = 0
+        # time-boxed incremental uniqueness: the puzzle stays unique iff no
+        # solution exists with (r,c) forced away from its original value
         start = time.time()
-        has, nsol = solve_unique([row[:] for row in puzzle], limit_solutions=2)
-        if (time.time() - start) > uniq_timeout_s or (not has or nsol != 1):
-            puzzle[r][c] = v  # restore if timed out or non-unique
+        second = has_second_solution(puzzle, r, c, v)
+        if second or (time.time() - start) > uniq_timeout_s:
+            puzzle[r, c] = v  # restore if non-unique or timed out
     return puzzle
 
 def generate_samurai(rng: random.Random, difficulty: str,
@@ -99,14 +156,15 @@ def generate_samurai(rng: random.Random, difficulty: str,
         raise ValueError(f"Unknown difficulty: {difficulty}")
     base_target = DIFFICULTY_CLUES[difficulty]
 
-    # FAST solved Samurai
-    solved = _solve_samurai_by_composition(rng)
+    # FAST solved Samurai (cached per process, varied via symmetry transforms)
+    solved = _get_solved_board(rng)
 
     # Dig with time-boxed uniqueness + adapt target slightly if needed
     target = base_target
     for attempt in range(3):
         puzzle = _dig_holes_to_target(rng, solved, target_clues=target, uniq_timeout_s=uniq_timeout_s)
-        has, nsol = solve_unique([row[:] for row in puzzle], limit_solutions=2)
+        # solve_unique restores the grid it is given, so no defensive copy
+        has, nsol = solve_unique(puzzle, limit_solutions=2)
         if has and nsol == 1:
             return puzzle, solved
         if not adapt:
@@ -1,5 +1,7 @@
 from typing import Iterable, List, Tuple
 
+import numpy as np
+
 # Global Samurai canvas is 21x21. Inactive cells are None.
 BOARD_SIZE = 21
 
@@ -15,14 +17,51 @@ BOARDS = [
 def in_board(r: int, c: int, r0: int, c0: int) -> bool:
     return r0 <= r < r0 + 9 and c0 <= c < c0 + 9
 
+# The layout never changes, so containment queries are precomputed at import:
+# active_cells/boards_covering_cell sit inside the solver's hot loops and must
+# be pure lookups, not 21x21 rescans.
+_BOARDS_COVERING = {
+    (r, c): tuple((name, r0, c0) for (name, r0, c0) in BOARDS if in_board(r, c, r0, c0))
+    for r in range(BOARD_SIZE)
+    for c in range(BOARD_SIZE)
+}
+_ACTIVE_CELLS = tuple(
+    (r, c)
+    for r in range(BOARD_SIZE)
+    for c in range(BOARD_SIZE)
+    if _BOARDS_COVERING[(r, c)]
+)
+_ACTIVE_MASK = np.zeros((BOARD_SIZE, BOARD_SIZE), dtype=bool)
+for _r, _c in _ACTIVE_CELLS:
+    _ACTIVE_MASK[_r, _c] = True
+
+def _peers_for_cell(r: int, c: int) -> np.ndarray:
+    peers = set()
+    for _, r0, c0 in _BOARDS_COVERING[(r, c)]:
+        rr, cc = r - r0, c - c0
+        for i in range(9):
+            peers.add((r0 + rr) * BOARD_SIZE + (c0 + i))
+            peers.add((r0 + i) * BOARD_SIZE + (c0 + cc))
+        br, bc = (rr // 3) * 3, (cc // 3) * 3
+        for y in range(3):
+            for x in range(3):
+                peers.add((r0 + br + y) * BOARD_SIZE + (c0 + bc + x))
+    peers.discard(r * BOARD_SIZE + c)
+    return np.array(sorted(peers), dtype=np.int16)
+
+# Flat 21x21 indices of every cell sharing a row/col/box (in any covering
+# board) with the key cell, so constraint checks are one fancy-indexed
+# comparison instead of per-board scans.
+PEERS = {(r, c): _peers_for_cell(r, c) for (r, c) in _ACTIVE_CELLS}
+
 def is_active_cell(r: int, c: int) -> bool:
-    return any(in_board(r, c, r0, c0) for _, r0, c0 in BOARDS)
+    return bool(_BOARDS_COVERING[(r, c)])
 
-def active_cells() -> List[Tuple[int, int]]:
-    return [(r, c) for r in range(BOARD_SIZE) for c in range(BOARD_SIZE) if is_active_cell(r, c)]
+def active_cells() -> Tuple[Tuple[int, int], ...]:
+    return _ACTIVE_CELLS
 
-def boards_covering_cell(r: int, c: int) -> List[Tuple[str, int, int]]:
-    return [(name, r0, c0) for (name, r0, c0) in BOARDS if in_board(r, c, r0, c0)]
+def boards_covering_cell(r: int, c: int) -> Tuple[Tuple[str, int, int], ...]:
+    return _BOARDS_COVERING[(r, c)]
 
 def row_cells_in_board(r0: int, c0: int, rr: int) -> Iterable[Tuple[int, int]]:
     for cc in range(9):
@@ -1,70 +1,89 @@
 from __future__ import annotations
-from typing import List, Optional, Tuple
-from .geometry import BOARD_SIZE, is_active_cell, boards_covering_cell, subgrid_index
+from typing import List, Tuple
 
-Value = Optional[int]  # 1..9 or None
-Grid = List[List[Value]]  # 21x21 with None for inactive cells + also None for empty active
+import numpy as np
+
+from .geometry import BOARD_SIZE, BOARDS, PEERS, in_board, is_active_cell
+
+Value = int  # 1..9; 0 means empty (inactive cells are always 0)
+Grid = np.ndarray  # (21, 21) int8 canvas; one contiguous buffer, cheap to copy
+
+# Digits are tracked as 9-bit masks: bit d means "digit d+1 is used".
+DIGIT_MASK = 0x1FF
+
+def _units_for_cell(r: int, c: int) -> Tuple[Tuple[int, int, int, int], ...]:
+    units = []
+    for b, (_, r0, c0) in enumerate(BOARDS):
+        if in_board(r, c, r0, c0):
+            rr = r - r0
+            cc = c - c0
+            units.append((b, rr, cc, (rr // 3) * 3 + cc // 3))
+    return tuple(units)
+
+# For each active cell, the (board, row, col, box) unit indices of every board
+# covering it (two boards for overlap cells, one otherwise).
+_CELL_UNITS = {
+    (r, c): _units_for_cell(r, c)
+    for r in range(BOARD_SIZE)
+    for c in range(BOARD_SIZE)
+    if is_active_cell(r, c)
+}
+
+def cell_units(r: int, c: int) -> Tuple[Tuple[int, int, int, int], ...]:
+    """Unit indices (board, row, col, box) for every board covering (r,c)."""
+    return _CELL_UNITS[(r, c)]
 
 def empty_samurai_grid() -> Grid:
-    g: Grid = [[None for _ in range(BOARD_SIZE)] for _ in range(BOARD_SIZE)]
-    for r in range(BOARD_SIZE):
-        for c in range(BOARD_SIZE):
-            if is_active_cell(r, c):
-                g[r][c] = None
-            else:
-                g[r][c] = None  # keep None but treated as inactive by geometry
-    return g
+    # 0 everywhere; inactive cells simply stay 0 and are never touched
+    return np.zeros((BOARD_SIZE, BOARD_SIZE), dtype=np.int8)
 
 def copy_grid(g: Grid) -> Grid:
-    return [row[:] for row in g]
+    return g.copy()
 
 def is_cell_empty(g: Grid, r: int, c: int) -> bool:
-    return g[r][c] is None
+    return g[r, c] == 0
+
+def build_masks(g: Grid) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Used-digit bitmasks per board row/col/box, built in one pass over the
+    grid. Each is a flat int16 array indexed by board*9 + unit, so the solver
+    can gather them with vectorized fancy indexing.
+    """
+    n = len(BOARDS) * 9
+    row_used = np.zeros(n, dtype=np.int16)
+    col_used = np.zeros(n, dtype=np.int16)
+    box_used = np.zeros(n, dtype=np.int16)
+    for (r, c), units in _CELL_UNITS.items():
+        v = int(g[r, c])
+        if v == 0:
+            continue
+        bit = 1 << (v - 1)
+        for b, rr, cc, bb in units:
+            row_used[b * 9 + rr] |= bit
+            col_used[b * 9 + cc] |= bit
+            box_used[b * 9 + bb] |= bit
+    return row_used, col_used, box_used
+
+def mask_to_candidates(mask: int) -> List[int]:
+    """Expand a candidate bitmask into the list of digits it contains."""
+    out = []
+    while mask:
+        low = mask & -mask
+        out.append(low.bit_length())
+        mask ^= low
+    return out
+
+# digit value (0..9) -> its used-mask bit (0 for empty)
+_VALUE_BIT = np.array([0] + [1 << d for d in range(9)], dtype=np.int16)
+
+def _used_mask(g: Grid, r: int, c: int) -> int:
+    vals = g.ravel()[PEERS[(r, c)]]
+    return int(np.bitwise_or.reduce(_VALUE_BIT[vals]))
 
 def candidates(g: Grid, r: int, c: int) -> List[int]:
     """Return allowed digits 1..9 at (r,c) respecting ALL boards covering that cell."""
-    used = set()
-    for _, r0, c0 in boards_covering_cell(r, c):
-        # row
-        rr = r - r0
-        for cc in range(9):
-            v = g[r0 + rr][c0 + cc]
-            if v is not None:
-                used.add(v)
-        # col
-        cc = c - c0
-        for rr2 in range(9):
-            v = g[r0 + rr2][c0 + cc]
-            if v is not None:
-                used.add(v)
-        # box
-        br, bc = subgrid_index(r, c, r0, c0)
-        for rr3 in range(br * 3, br * 3 + 3):
-            for cc3 in range(bc * 3, bc * 3 + 3):
-                v = g[r0 + rr3][c0 + cc3]
-                if v is not None:
-                    used.add(v)
-    return [d for d in range(1, 10) if d not in used]
+    return mask_to_candidates(DIGIT_MASK & ~_used_mask(g, r, c))
 
 def is_valid_assignment(g: Grid, r: int, c: int, v: int) -> bool:
-    """Fast validity check for placing v at (r,c)."""
-    for _, r0, c0 in boards_covering_cell(r, c):
-        rr = r - r0
-        cc = c - c0
-        # row
-        for x in range(9):
-            if (c0 + x) != c and g[r0 + rr][c0 + x] == v:
-                return False
-        # col
-        for y in range(9):
-            if (r0 + y) != r and g[r0 + y][c0 + cc] == v:
-                return False
-        # box
-        br = (rr // 3) * 3
-        bc = (cc // 3) * 3
-        for y in range(3):
-            for x in range(3):
-                R, C = r0 + br + y, c0 + bc + x
-                if (R, C) != (r, c) and g[R][C] == v:
-                    return False
-    return True
\ No newline at end of file
+    """Fast validity check for placing v at an empty (r,c)."""
+    return not bool((g.ravel()[PEERS[(r, c)]] == v).any())
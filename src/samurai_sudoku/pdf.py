@@ -5,7 +5,7 @@ from reportlab.lib.pagesizes import A4, LETTER, LEGAL
 from reportlab.lib.units import mm, inch
 from reportlab.pdfgen.canvas import Canvas
 
-from .geometry import BOARDS, in_board
+from .geometry import active_cells
 
 # Built-ins plus two handy trim sizes for puzzle books
 PageSizeMap = {
@@ -86,20 +86,28 @@ def _draw_digits(c: Canvas, grid, x_origin: float, y_origin: float, cell: float,
     Uses font-size derived from the cell size to avoid overflow.
     """
     fs = _font_size_for_cell(cell, mini)
-    c.setFont("Helvetica", fs)
-
-    for r in range(21):
-        for cc in range(21):
-            # skip inactive cells
-            if not any(in_board(r, cc, r0, c0) for _, r0, c0 in BOARDS):
-                continue
-            v = grid[r][cc]
-            if v is None:
-                continue
-            x_center = x_origin + cc * cell + cell * 0.5
-            # baseline slightly below center improves optical centering
-            y_base = y_origin + r * cell + (cell * 0.5 - fs * 0.30)
-            c.drawCentredString(x_center, y_base, str(v))
+
+    half_cell = cell * 0.5
+    # baseline slightly below center improves optical centering
+    y_shift = half_cell - fs * 0.30
+    # Batch all digits into one text object: a single font setup and one PDF
+    # operator stream instead of a drawCentredString round trip per digit.
+    # Centering offsets per digit are precomputed from the glyph widths.
+    digit_strs = [str(d) for d in range(10)]
+    x_offsets = [
+        half_cell - c.stringWidth(digit_strs[d], "Helvetica", fs) * 0.5
+        for d in range(10)
+    ]
+    textobj = c.beginText()
+    textobj.setFont("Helvetica", fs)
+    for r, cc in active_cells():
+        v = grid[r][cc]
+        if not v:  # 0 = empty cell
+            continue
+        textobj.setTextOrigin(x_origin + cc * cell + x_offsets[v],
+                              y_origin + r * cell + y_shift)
+        textobj.textOut(digit_strs[v])
+    c.drawText(textobj)
 
 # -------------------------------
 # Page-level helpers
@@ -1,51 +1,141 @@
 from __future__ import annotations
 import random
 from typing import List, Optional, Tuple
-from .geometry import active_cells
-from .model import Grid, candidates, is_cell_empty, is_valid_assignment
-
-def find_next_cell(g: Grid) -> Optional[Tuple[int, int, List[int]]]:
-    """MRV heuristic: choose empty cell with fewest candidates."""
-    best: Optional[Tuple[int, int, List[int]]] = None
-    for r, c in active_cells():
-        if g[r][c] is None:
-            cand = candidates(g, r, c)
-            if not cand:
-                return None
-            if best is None or len(cand) < len(best[2]):
-                best = (r, c, cand)
-                if len(cand) == 1:
-                    break
-    return best
-
-def solve_unique(g: Grid, limit_solutions: int = 2) -> Tuple[bool, int]:
+
+import numpy as np
+
+from .geometry import BOARD_SIZE, active_cells
+from .model import DIGIT_MASK, Grid, build_masks, cell_units, mask_to_candidates
+
+# Static index tables so MRV selection can run as one vectorized pass over all
+# active cells: for cell i, its candidate mask is
+#   ~(row_used[_ROW_A[i]] | col_used[_COL_A[i]] | box_used[_BOX_A[i]]
+#     | row_used[_ROW_B[i]] | ...)
+# where the B triple is the second covering board (duplicated from A for
+# non-overlap cells, which makes the extra OR a no-op).
+_ACTIVE = active_cells()
+_ACT_FLAT = np.array([r * BOARD_SIZE + c for r, c in _ACTIVE], dtype=np.intp)
+_ACT_INDEX = {rc: i for i, rc in enumerate(_ACTIVE)}
+_ROW_A = np.empty(len(_ACTIVE), dtype=np.intp)
+_COL_A = np.empty(len(_ACTIVE), dtype=np.intp)
+_BOX_A = np.empty(len(_ACTIVE), dtype=np.intp)
+_ROW_B = np.empty(len(_ACTIVE), dtype=np.intp)
+_COL_B = np.empty(len(_ACTIVE), dtype=np.intp)
+_BOX_B = np.empty(len(_ACTIVE), dtype=np.intp)
+# per-cell flat unit ids for the incremental mask updates
+_UNIT_IDS = {}
+for _i, (_r, _c) in enumerate(_ACTIVE):
+    _units = cell_units(_r, _c)
+    _b, _rr, _cc, _bb = _units[0]
+    _ROW_A[_i], _COL_A[_i], _BOX_A[_i] = _b * 9 + _rr, _b * 9 + _cc, _b * 9 + _bb
+    _b, _rr, _cc, _bb = _units[-1]
+    _ROW_B[_i], _COL_B[_i], _BOX_B[_i] = _b * 9 + _rr, _b * 9 + _cc, _b * 9 + _bb
+    _UNIT_IDS[(_r, _c)] = tuple(
+        (b * 9 + rr, b * 9 + cc, b * 9 + bb) for b, rr, cc, bb in _units
+    )
+_POPCOUNT = np.array([bin(m).count("1") for m in range(512)], dtype=np.int8)
+
+def _count_solutions(grid: Grid, limit_solutions: int, shuffle: bool = False,
+                     forbid: Optional[Tuple[int, int, int]] = None) -> int:
     """
-    Solve with backtracking, counting number of solutions up to limit_solutions.
-    Returns (has_solution, count<=limit).
+    Core backtracking search: count solutions up to limit_solutions.
+    forbid=(r, c, v) excludes digit v at cell (r, c) from the search.
+    The grid is left exactly as it was found, including on early exit.
     """
     count = 0
-    grid = g
+    # Used-digit bitmasks per board unit, updated incrementally as cells are
+    # placed/undone, so candidate lookup is a few ORs instead of a 27-cell scan.
+    row_used, col_used, box_used = build_masks(grid)
+    flat = grid.ravel()  # view: shares the grid's buffer
+    empty_count = int((flat[_ACT_FLAT] == 0).sum())
+
+    forbid_pos, forbid_clear = -1, np.int16(-1)
+    if forbid is not None:
+        fr, fc, fv = forbid
+        forbid_pos = _ACT_INDEX[(fr, fc)]
+        forbid_clear = np.int16(DIGIT_MASK & ~(1 << (fv - 1)))
+
+    def find_next_cell() -> Optional[Tuple[int, int, int]]:
+        """MRV: candidate popcounts for all active cells at once, then argmin."""
+        used = (row_used[_ROW_A] | col_used[_COL_A] | box_used[_BOX_A]
+                | row_used[_ROW_B] | col_used[_COL_B] | box_used[_BOX_B])
+        cand = DIGIT_MASK & ~used
+        if forbid_pos >= 0:
+            cand[forbid_pos] &= forbid_clear
+        counts = np.where(flat[_ACT_FLAT] == 0, _POPCOUNT[cand], np.int8(127))
+        i = int(counts.argmin())
+        if counts[i] == 0:
+            return None
+        r, c = _ACTIVE[i]
+        return r, c, int(cand[i])
+
+    first_sol: Optional[Grid] = None
 
     def backtrack() -> bool:
-        nonlocal count
-        nxt = find_next_cell(grid)
-        if nxt is None:
-            # Either no moves (dead) or already full. Check if full:
-            # If no empty cells exist, solved.
-            for r, c in active_cells():
-                if grid[r][c] is None:
-                    return False
+        nonlocal count, empty_count, first_sol
+        if empty_count == 0:
             count += 1
+            if count == 1 and limit_solutions > 1:
+                first_sol = grid.copy()
             return count >= limit_solutions  # stop if enough
-        r, c, cand = nxt
-        random.shuffle(cand)
+        nxt = find_next_cell()
+        if nxt is None:
+            return False  # some empty cell has no candidates
+        r, c, mask = nxt
+        cand = mask_to_candidates(mask)
+        if shuffle:
+            random.shuffle(cand)
+        if first_sol is not None:
+            # Hunting for a second solution: any further solution must differ
+            # from the first somewhere, so try divergent digits first and
+            # replay the known value only as a last resort.
+            fv = first_sol[r, c]
+            cand.sort(key=lambda v: v == fv)
+        units = _UNIT_IDS[(r, c)]
         for v in cand:
-            if is_valid_assignment(grid, r, c, v):
-                grid[r][c] = v
-                if backtrack():
-                    return True
-                grid[r][c] = None
+            bit = 1 << (v - 1)
+            grid[r, c] = v
+            empty_count -= 1
+            for ri, ci, bi in units:
+                row_used[ri] |= bit
+                col_used[ci] |= bit
+                box_used[bi] |= bit
+            done = backtrack()
+            for ri, ci, bi in units:
+                row_used[ri] ^= bit
+                col_used[ci] ^= bit
+                box_used[bi] ^= bit
+            grid[r, c] = 0
+            empty_count += 1
+            if done:
+                return True
         return False
 
     backtrack()
-    return (count > 0, count)
\ No newline at end of file
+    return count
+
+def solve_unique(g: Grid, limit_solutions: int = 2, shuffle: bool = False) -> Tuple[bool, int]:
+    """
+    Solve with backtracking, counting number of solutions up to limit_solutions.
+    Returns (has_solution, count<=limit). The grid is left exactly as it was
+    passed in (every placement is undone, including on the early exit when the
+    limit is reached), so callers can hand over their working grid directly.
+
+    shuffle randomizes the value order at each node. Counting solutions visits
+    the same search tree either way, so uniqueness checks leave it off; enable
+    it only when a *random* solution is wanted.
+    """
+    count = _count_solutions(g, limit_solutions, shuffle=shuffle)
+    return (count > 0, count)
+
+def has_second_solution(g: Grid, r: int, c: int, v: int) -> bool:
+    """
+    With (r,c) empty, report whether some solution assigns it a digit != v.
+
+    This is the incremental uniqueness check for digging: if a puzzle was
+    unique before clearing (r,c) (solution value v), it stays unique exactly
+    when no solution exists with (r,c) forced away from v. Searching for one
+    divergent solution is far cheaper than re-counting to 2 from scratch.
+    The grid is restored before returning.
+    """
+    return _count_solutions(g, 1, forbid=(r, c, v)) > 0
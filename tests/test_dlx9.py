@@ -0,0 +1,34 @@
+from samurai_sudoku.dlx9 import solve_count, solve_random
+import random
+
+def _assert_valid_sudoku(board):
+    want = list(range(1, 10))
+    for r in range(9):
+        assert sorted(board[r]) == want
+    for c in range(9):
+        assert sorted(board[r][c] for r in range(9)) == want
+    for br in range(0, 9, 3):
+        for bc in range(0, 9, 3):
+            box = [board[br + y][bc + x] for y in range(3) for x in range(3)]
+            assert sorted(box) == want
+
+def test_solve_random_valid():
+    rng = random.Random(42)
+    _assert_valid_sudoku(solve_random(rng, []))
+
+def test_solve_random_respects_givens():
+    rng = random.Random(42)
+    base = solve_random(rng, [])
+    givens = [(r, c, base[r][c] - 1) for r in range(3) for c in range(3)]
+    board = solve_random(rng, givens)
+    _assert_valid_sudoku(board)
+    for r, c, d in givens:
+        assert board[r][c] == d + 1
+
+def test_solve_count():
+    rng = random.Random(7)
+    base = solve_random(rng, [])
+    full = [(r, c, base[r][c] - 1) for r in range(9) for c in range(9)]
+    assert solve_count(full) == 1
+    assert solve_count(full[:-1]) == 1  # one blank stays unique
+    assert solve_count([], limit=3) == 3  # empty board caps at the limit
@@ -4,4 +4,6 @@ import random
 def test_generate_unique():
     rng = random.Random(123)
     puzzle, solution = generate_samurai(rng, "easy")
-    assert puzzle and solution
\ No newline at end of file
+    assert puzzle.shape == (21, 21)
+    assert solution.shape == (21, 21)
+    assert solution.any()
\ No newline at end of file